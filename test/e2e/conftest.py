@@ -1,6 +1,11 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 
 import boto3
+import botocore.config
+import botocore.session
+from botocore.client import BaseClient
+import configparser
+import copy
 import glob
 import json
 import logging
@@ -9,11 +14,14 @@ import pathlib
 import posixpath
 import pytest
 import tempfile
+import threading
 from dataclasses import dataclass, field, InitVar
-from typing import Generator, Type
+from typing import Any, Generator, Optional, Type
 from contextlib import contextmanager
 
+from deadline.client.config import set_setting
 from deadline_test_fixtures import (
+    DeadlineClient,
     DeadlineWorker,
     DeadlineWorkerConfiguration,
     DockerContainerWorker,
@@ -26,12 +34,20 @@ from deadline_test_fixtures import (
     PosixSessionUser,
     OperatingSystem,
 )
-import pytest
 
 LOG = logging.getLogger(__name__)
 
 pytest_plugins = ["deadline_test_fixtures.pytest_hooks"]
 
+# Tests fan out Deadline API calls across threads, so allow more pooled connections than
+# botocore's default of 10, keep idle connections alive between polls, and let the client adapt
+# its retry rate when throttled.
+DEADLINE_CLIENT_CONFIG = botocore.config.Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={"max_attempts": 10, "mode": "adaptive"},
+)
+
 
 @dataclass(frozen=True)
 class DeadlineResources:
@@ -72,6 +88,48 @@ class DeadlineResources:
         object.__setattr__(self, "scaling_fleet", Fleet(id=scaling_fleet_id, farm=self.farm))
 
 
+class SessionActionCache:
+    """
+    Remembers the session actions of sessions that can no longer change: every environment the
+    session entered has an envExit, and every action is in a terminal status. Nothing is scheduled in
+    a session after its environments exit, so polls can skip ListSessionActions for those sessions
+    instead of fetching the same response every retry. This is decided from the actions alone, so
+    it holds even when the caller's session list is an old snapshot.
+    """
+
+    TERMINAL_STATUSES = frozenset(("SUCCEEDED", "FAILED", "CANCELED", "NEVER_ATTEMPTED"))
+
+    def __init__(self) -> None:
+        self._session_actions: dict[str, list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[list[dict[str, Any]]]:
+        with self._lock:
+            return self._session_actions.get(session_id)
+
+    def put(self, session_id: str, session_actions: list[dict[str, Any]]) -> None:
+        if any(action["status"] not in self.TERMINAL_STATUSES for action in session_actions):
+            return
+        entered: set[str] = set()
+        exited: set[str] = set()
+        for action in session_actions:
+            definition: dict[str, Any] = action["definition"]
+            if "envEnter" in definition:
+                entered.add(definition["envEnter"]["environmentId"])
+            elif "envExit" in definition:
+                exited.add(definition["envExit"]["environmentId"])
+        # A session with no environments, or one still inside some, can be assigned more actions
+        if not entered or not entered <= exited:
+            return
+        with self._lock:
+            self._session_actions[session_id] = session_actions
+
+
+@pytest.fixture(scope="function")
+def session_action_cache() -> SessionActionCache:
+    return SessionActionCache()
+
+
 @pytest.fixture(scope="session")
 def deadline_resources() -> Generator[DeadlineResources, None, None]:
     """
@@ -117,6 +175,71 @@ def deadline_resources() -> Generator[DeadlineResources, None, None]:
     )
 
 
+@pytest.fixture(scope="session")
+def deadline_client(install_service_model: str) -> DeadlineClient:
+    """
+    Overrides the deadline_test_fixtures client so that it is created with DEADLINE_CLIENT_CONFIG.
+
+    Environment Variables:
+        DEADLINE_ENDPOINT: Endpoint URL to use for the Deadline Cloud API.
+
+    Returns:
+        DeadlineClient: The Deadline client used for tests
+    """
+    endpoint_url = os.getenv("DEADLINE_ENDPOINT")
+    if endpoint_url:
+        LOG.info(f"Using AWS Deadline Cloud endpoint: {endpoint_url}")
+
+    # Create the client from one botocore session, so credentials are resolved once and every call
+    # goes through the same connection pool
+    session = botocore.session.get_session()
+    session.get_component("data_loader").search_paths.extend([install_service_model])
+
+    return DeadlineClient(
+        session.create_client("deadline", endpoint_url=endpoint_url, config=DEADLINE_CLIENT_CONFIG)
+    )
+
+
+@pytest.fixture(scope="session")
+def cloudwatch_logs_client() -> BaseClient:
+    """
+    A CloudWatch Logs client shared by all tests, so that its credentials and connection pool are
+    set up once per test session rather than for every log assertion.
+    """
+    return boto3.client(
+        "logs",
+        config=botocore.config.Config(
+            retries={"max_attempts": 10, "mode": "adaptive"},
+            max_pool_connections=32,
+        ),
+    )
+
+
+@pytest.fixture(scope="session")
+def base_job_bundle_config(deadline_resources: DeadlineResources) -> configparser.ConfigParser:
+    """
+    Deadline client settings shared by every job bundle submission: just the test farm, since that
+    is the same for all tests. Built once per test session; tests should take job_bundle_config.
+    """
+    config = configparser.ConfigParser()
+    set_setting("defaults.farm_id", deadline_resources.farm.id, config)
+    return config
+
+
+@pytest.fixture(scope="function")
+def job_bundle_config(
+    base_job_bundle_config: configparser.ConfigParser, deadline_resources: DeadlineResources
+) -> configparser.ConfigParser:
+    """
+    A private copy of base_job_bundle_config that submits to queue A. Tests that need another queue
+    set defaults.queue_id on it themselves.
+    """
+    # A deep copy, since a shallow copy of a ConfigParser shares its section dicts with the original
+    config = copy.deepcopy(base_job_bundle_config)
+    set_setting("defaults.queue_id", deadline_resources.queue_a.id, config)
+    return config
+
+
 @pytest.fixture(scope="session")
 def worker_config(
     deadline_resources,
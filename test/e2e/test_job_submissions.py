@@ -3,34 +3,300 @@
 This test module contains tests that verify the Worker agent's behavior by submitting jobs to the
 Deadline Cloud service and checking that the result/output of the jobs is as we expect it.
 """
+from __future__ import annotations
+
+import codecs
+import copy
+from configparser import ConfigParser
+import functools
 import hashlib
 from flaky import flaky
 import json
 import pathlib
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 import pytest
 import logging
 from deadline_test_fixtures import Job, DeadlineClient, TaskStatus, EC2InstanceWorker
-from e2e.conftest import DeadlineResources
+from e2e.conftest import DeadlineResources, SessionActionCache
 import backoff
-import boto3
-import botocore.client
-import botocore.config
-import botocore.exceptions
 import re
+import shutil
 import time
 from deadline.client.config import set_setting
 from deadline.client import api
 import uuid
 import os
-import configparser
 import tempfile
-from e2e.utils import wait_for_job_output, submit_sleep_job, submit_custom_job
+from e2e.utils import (
+    environment_name,
+    find_session_action,
+    get_job,
+    get_job_sessions,
+    list_session_actions_by_session,
+    session_action_kind,
+    sha256_file,
+    poll_until,
+    wait_for_job_output,
+    submit_sleep_job,
+    submit_custom_job,
+    wait_for_job_created,
+    write_small_files,
+)
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
 
 LOG = logging.getLogger(__name__)
 
+# The OS is fixed for the whole test run, so resolve the OS-dependent template pieces once
+_OS: str = os.environ["OPERATING_SYSTEM"]
+_IS_LINUX: bool = _OS == "linux"
+_IS_WINDOWS: bool = _OS == "windows"
+
+# Shared by the job templates below. boto3 only serializes it, so it is never mutated.
+_HOST_REQ: dict[str, Any] = {"attributes": [{"name": "attr.worker.os.family", "allOf": [_OS]}]}
+
+# Separating the string is needed to prevent the expected string appearing in output logs more
+# times than expected, as windows worker logs print the command
+_ECHO_HELLO_ACTION: dict[str, Any] = (
+    {"command": "echo", "args": ["Hello!"]}
+    if _IS_LINUX
+    else {"command": "powershell", "args": ['"Hello"', "+", '"!"']}
+)
+_ECHO_HELLO_SCRIPT: dict[str, Any] = {"actions": {"onEnter": _ECHO_HELLO_ACTION}}
+
+
+def _mk_envs(n: int) -> list[dict[str, Any]]:
+    return [{"name": f"environment_{i}", "script": _ECHO_HELLO_SCRIPT} for i in range(1, n + 1)]
+
+
+_HELLO_3X: re.Pattern[str] = re.compile(r"Hello!.*Hello!.*Hello!", re.DOTALL)
+
+_JOB_ATTACHMENT_BUNDLE_PATH: str = os.path.join(os.path.dirname(__file__), "job_attachment_bundle")
+
+
+def _write_template(job_bundle_path: str | os.PathLike[str], template: dict[str, Any]) -> None:
+    # Every job bundle test generates its template.json the same way: compact UTF-8 JSON
+    with open(
+        os.path.join(job_bundle_path, "template.json"), "w", encoding="utf-8"
+    ) as template_file:
+        json.dump(template, template_file, separators=(",", ":"))
+
+
+_SLEEP_CMD: tuple[str, list[str]] = (
+    ("/bin/sleep", ["40"]) if _IS_LINUX else ("powershell", ["ping", "localhost", "-n", "40"])
+)
+_LONG_SLEEP_ACTION: dict[str, Any] = {
+    "command": _SLEEP_CMD[0],
+    "args": _SLEEP_CMD[1],
+    "cancelation": {
+        "mode": "NOTIFY_THEN_TERMINATE",
+        "notifyPeriodInSeconds": 1,
+    },
+}
+
+
+_SYNC_INPUTS_TEMPLATE: dict[str, Any] = {
+    "specificationVersion": "jobtemplate-2023-09",
+    "name": "SyncInputsJob",
+    "parameterDefinitions": [
+        {
+            "name": "DataDir",
+            "type": "PATH",
+            "dataFlow": "INOUT",
+        },
+    ],
+    "steps": [
+        {
+            "name": "WhoamiStep",
+            "hostRequirements": _HOST_REQ,
+            "script": {
+                "actions": {"onRun": {"command": "whoami"}},
+            },
+        }
+    ],
+}
+
+_ACTION_SCRIPT_LINUX: str = "#!/usr/bin/env bash\n trap 'exit 0' SIGINT\n bash\n\n sleep 300\n "
+_ACTION_SCRIPT_WIN: str = """try
+                {
+                    Start-Sleep -Seconds 300
+                }
+                finally
+                {
+                    Exit
+                }"""
+
 
-@pytest.mark.parametrize("operating_system", [os.environ["OPERATING_SYSTEM"]], indirect=True)
+@functools.lru_cache(maxsize=None)
+def _build_cancel_trap_template(expected_canceled_action: str) -> dict[str, Any]:
+    """
+    Builds a job template that sleeps for a long time, while trapping SIGINT, in either the envEnter
+    or the taskRun action. The result is cached, so callers must copy it before modifying it.
+    """
+    action_script: str = _ACTION_SCRIPT_LINUX if _IS_LINUX else _ACTION_SCRIPT_WIN
+    return {
+        "specificationVersion": "jobtemplate-2023-09",
+        "name": f"jobactioncanceltrap-{expected_canceled_action}",
+        "steps": [
+            {
+                "name": "Step0",
+                "hostRequirements": _HOST_REQ,
+                "script": {
+                    "actions": {
+                        "onRun": (
+                            {"command": "{{ Task.File.runScript }}"}
+                            if _IS_LINUX
+                            else {
+                                "command": "powershell",
+                                "args": ["{{ Task.File.runScript }}"],
+                            }
+                        ),
+                    },
+                    "embeddedFiles": [
+                        {
+                            "name": "runScript",
+                            "type": "TEXT",
+                            "runnable": True,
+                            "data": (
+                                action_script if expected_canceled_action == "taskRun" else "whoami"
+                            ),
+                            **({"filename": "sleepscript.ps1"} if _IS_WINDOWS else {}),
+                        }
+                    ],
+                },
+            },
+        ],
+        "jobEnvironments": [
+            {
+                "name": "environment",
+                "script": {
+                    "actions": {
+                        "onEnter": (
+                            (
+                                {"command": "{{ Env.File.runScript }}"}
+                                if _IS_LINUX
+                                else {
+                                    "command": "powershell",
+                                    "args": ["{{ Env.File.runScript }}"],
+                                }
+                            )
+                            if expected_canceled_action == "envEnter"
+                            else {"command": "whoami"}
+                        ),
+                    },
+                    "embeddedFiles": [
+                        {
+                            "name": "runScript",
+                            "type": "TEXT",
+                            "runnable": True,
+                            "data": (
+                                action_script
+                                if expected_canceled_action == "envEnter"
+                                else "whoami"
+                            ),
+                            **({"filename": "sleepscript.ps1"} if _IS_WINDOWS else {}),
+                        }
+                    ],
+                },
+            }
+        ],
+    }
+
+
+_APPEND_STRING_SCRIPT: str = (
+    "#!/usr/bin/env bash\n\n  echo -n $(cat {{Param.DataDir}}/files/test_input_file){{Param.StringToAppend}} > {{Param.DataDir}}/output_file\n"
+    if _IS_LINUX
+    else '''set /p input=<"{{Param.DataDir}}\\files\\test_input_file"\n powershell -Command "echo ($env:input+\'{{Param.StringToAppend}}\') | Out-File -encoding utf8 {{Param.DataDir}}\\output_file -NoNewLine"'''
+)
+# Appends a fixed string, for jobs that are not expected to get as far as running it
+_APPEND_HI_SCRIPT: str = _APPEND_STRING_SCRIPT.replace("{{Param.StringToAppend}}", "hi")
+
+_HASH_SCRIPT_LINUX: str = (
+    "#!/usr/bin/env bash\n\n"
+    "folder_path={{Param.DataDir}}/files\n"
+    "# Hash all the files as one stream, in byte order of their names like the test's sorted()\n"
+    "sha256_hash=$(find \"$folder_path\" -maxdepth 1 -type f -name 'file_*.txt' -print0"
+    " | LC_ALL=C sort -z | xargs -0 cat | tr -d '\\n' | sha256sum | awk '{ print $1 }')\n"
+    'echo -n "$sha256_hash" > {{Param.DataDir}}/output_file.txt'
+)
+_HASH_SCRIPT_WIN: str = (
+    '$InputFolder = "{{Param.DataDir}}\\files"\n'
+    '$OutputFile = "{{Param.DataDir}}\\output_file.txt"\n'
+    "# Feed each file's bytes to one hash in turn rather than building the combined contents in\n"
+    "# memory, in ordinal name order to match the test's sorted()\n"
+    '$files = [IO.Directory]::GetFiles($InputFolder, "file_*.txt")\n'
+    "[Array]::Sort($files, [StringComparer]::Ordinal)\n"
+    "$sha256 = [System.Security.Cryptography.SHA256]::Create()\n"
+    "foreach ($file in $files) {\n"
+    "    $bytes = [IO.File]::ReadAllBytes($file)\n"
+    "    [void]$sha256.TransformBlock($bytes, 0, $bytes.Length, $null, 0)\n"
+    "}\n"
+    "[void]$sha256.TransformFinalBlock([byte[]]::new(0), 0, 0)\n"
+    '$hashString = [System.BitConverter]::ToString($sha256.Hash).Replace("-", "").ToLower()\n'
+    "Set-Content -Path $OutputFile -Value $hashString -NoNewLine"
+)
+_HASH_SCRIPT: str = _HASH_SCRIPT_LINUX if _IS_LINUX else _HASH_SCRIPT_WIN
+
+_PROGRESS_STATUS_MESSAGE: str = "Sleep job is running!"
+# Reports progress in steps of 10% every 6 seconds
+_PROGRESS_SLEEP_SCRIPT: str = (
+    f"""
+    #!/usr/bin/env bash
+    percent=0
+
+    while [ $percent -le 100 ]
+    do
+        echo "openjd_progress: $percent"
+        echo "openjd_status: {_PROGRESS_STATUS_MESSAGE}"
+        ((percent+=10))
+        sleep 6
+    done
+    """
+    if _IS_LINUX
+    else f"""
+    $percent = 0
+    while ($percent -le 100) {{
+        Write-Output "openjd_progress: $percent"
+        Write-Output "openjd_status: {_PROGRESS_STATUS_MESSAGE}"
+        $percent += 10
+        Start-Sleep -Seconds 6
+    }}
+    """
+)
+
+_LONG_SLEEP_SCRIPT: str = (
+    """
+    #!/usr/bin/env bash
+    sleep 600
+    """
+    if _IS_LINUX
+    else """
+    Start-Sleep -Seconds 600
+    """
+)
+
+
+@pytest.fixture(scope="session")
+def many_small_files(tmp_path_factory: pytest.TempPathFactory) -> tuple[pathlib.Path, str]:
+    """
+    A directory of 2500 very small files, file_{i+1}.txt containing str(i), and the sha256 of all
+    their contents concatenated in name order. The contents are fixed, so they are generated once
+    per session; tests copy the directory into their own job bundle.
+    """
+    files_dir: pathlib.Path = tmp_path_factory.mktemp("many_small_files") / "files"
+    files_dir.mkdir()
+    file_contents: dict[bytes, bytes] = {b"file_%d.txt" % (i + 1): b"%d" % i for i in range(2500)}
+    write_small_files(str(files_dir), file_contents)
+
+    # The contents are known, so there is no need to read the files back to hash them
+    combined_hash: str = hashlib.sha256(
+        b"".join(file_contents[file_name] for file_name in sorted(file_contents))
+    ).hexdigest()
+    return files_dir, combined_hash
+
+
+@pytest.mark.parametrize("operating_system", [_OS], indirect=True)
 class TestJobSubmission:
     def test_success(
         self,
@@ -121,14 +387,7 @@ class TestJobSubmission:
                 "name": f"jobactionfail-{expected_failed_action}",
                 "steps": [
                     {
-                        "hostRequirements": {
-                            "attributes": [
-                                {
-                                    "name": "attr.worker.os.family",
-                                    "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                }
-                            ]
-                        },
+                        "hostRequirements": _HOST_REQ,
                         "name": "Step0",
                         "script": {"actions": run_actions},
                     },
@@ -142,38 +401,42 @@ class TestJobSubmission:
         # Wait until the job is completed
         job.wait_until_complete(client=deadline_client)
 
+        # The session actions seen by the latest poll, which the check after it reuses
+        last_session_actions: list[list[dict[str, Any]]] = []
+
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=1.5,
+            factor=0.2,
+            max_value=10,
             max_time=60,
-            interval=10,
+            jitter=backoff.full_jitter,
         )
         def is_expected_session_action_failed(sessions: List[Dict[str, Any]]) -> bool:
-            found_failed_session_action: bool = False
-            for session in sessions:
-                session_actions = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=session["sessionId"],
-                ).get("sessionActions")
-
+            nonlocal last_session_actions
+            last_session_actions = list_session_actions_by_session(deadline_client, job, sessions)
+            for session_actions in last_session_actions:
                 logging.info(f"Session actions: {session_actions}")
                 for session_action in session_actions:
-                    # Session action should be failed IFF it's the expected action to fail
-                    if expected_failed_action in session_action["definition"]:
-                        if session_action["status"] == "FAILED":
-                            found_failed_session_action = True
-                    else:
-                        assert (
-                            session_action["status"] != "FAILED"
-                        ), f"Session action that should not have failed is in FAILED status. {session_action}"
-            return found_failed_session_action
-
-        sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-            farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-        ).get("sessions")
+                    if (
+                        session_action_kind(session_action) == expected_failed_action
+                        and session_action["status"] == "FAILED"
+                    ):
+                        return True
+            return False
+
+        sessions: list[dict[str, Any]] = get_job_sessions(deadline_client, job)
         assert is_expected_session_action_failed(sessions)
 
+        # Session action should be failed IFF it's the expected action to fail. This reuses the
+        # session actions from the final poll above.
+        for session_actions in last_session_actions:
+            for session_action in session_actions:
+                if session_action_kind(session_action) != expected_failed_action:
+                    assert (
+                        session_action["status"] != "FAILED"
+                    ), f"Session action that should not have failed is in FAILED status. {session_action}"
+
     def test_worker_fails_session_action_timeout(
         self,
         deadline_resources: DeadlineResources,
@@ -192,33 +455,13 @@ class TestJobSubmission:
                 "name": "JobSessionActionTimeoutFail",
                 "steps": [
                     {
-                        "hostRequirements": {
-                            "attributes": [
-                                {
-                                    "name": "attr.worker.os.family",
-                                    "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                }
-                            ]
-                        },
+                        "hostRequirements": _HOST_REQ,
                         "name": "Step0",
                         "script": {
                             "actions": {
                                 "onRun": {
-                                    "command": (
-                                        "/bin/sleep"
-                                        if os.environ["OPERATING_SYSTEM"] == "linux"
-                                        else "powershell"
-                                    ),
-                                    "args": (
-                                        ["40"]
-                                        if os.environ["OPERATING_SYSTEM"] == "linux"
-                                        else ["ping", "localhost", "-n", "40"]
-                                    ),
+                                    **_LONG_SLEEP_ACTION,
                                     "timeout": 1,  # Times out in 1 second
-                                    "cancelation": {
-                                        "mode": "NOTIFY_THEN_TERMINATE",
-                                        "notifyPeriodInSeconds": 1,
-                                    },
                                 },
                             },
                         },
@@ -233,21 +476,12 @@ class TestJobSubmission:
         job.wait_until_complete(client=deadline_client)
 
         found_task_run_action: bool = False
-        sessions: List[Dict[str, Any]] = deadline_client.list_sessions(
-            farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-        ).get("sessions")
-        for session in sessions:
-            session_actions: List[Dict[str, Any]] = deadline_client.list_session_actions(
-                farmId=job.farm.id,
-                queueId=job.queue.id,
-                jobId=job.id,
-                sessionId=session["sessionId"],
-            ).get("sessionActions")
-
+        sessions: List[Dict[str, Any]] = get_job_sessions(deadline_client, job)
+        for session_actions in list_session_actions_by_session(deadline_client, job, sessions):
             logging.info(f"Session Actions: {session_actions}")
             for session_action in session_actions:
                 # taskRun session action should be failed
-                if "taskRun" in session_action["definition"]:
+                if session_action_kind(session_action) == "taskRun":
                     found_task_run_action = True
                     session_action_id: str = session_action["sessionActionId"]
                     get_session_action_response: Dict[str, Any] = (
@@ -271,22 +505,7 @@ class TestJobSubmission:
         [
             (
                 {
-                    "onRun": {
-                        "command": (
-                            "/bin/sleep"
-                            if os.environ["OPERATING_SYSTEM"] == "linux"
-                            else "powershell"
-                        ),
-                        "args": (
-                            ["40"]
-                            if os.environ["OPERATING_SYSTEM"] == "linux"
-                            else ["ping", "localhost", "-n", "40"]
-                        ),
-                        "cancelation": {
-                            "mode": "NOTIFY_THEN_TERMINATE",
-                            "notifyPeriodInSeconds": 1,
-                        },
-                    },
+                    "onRun": _LONG_SLEEP_ACTION,
                 },
                 {
                     "onEnter": {
@@ -302,22 +521,7 @@ class TestJobSubmission:
                     },
                 },
                 {
-                    "onEnter": {
-                        "command": (
-                            "/bin/sleep"
-                            if os.environ["OPERATING_SYSTEM"] == "linux"
-                            else "powershell"
-                        ),
-                        "args": (
-                            ["40"]
-                            if os.environ["OPERATING_SYSTEM"] == "linux"
-                            else ["ping", "localhost", "-n", "40"]
-                        ),
-                        "cancelation": {
-                            "mode": "NOTIFY_THEN_TERMINATE",
-                            "notifyPeriodInSeconds": 1,
-                        },
-                    },
+                    "onEnter": _LONG_SLEEP_ACTION,
                 },
                 "envEnter",
             ),
@@ -343,14 +547,7 @@ class TestJobSubmission:
                 "steps": [
                     {
                         "name": "Step0",
-                        "hostRequirements": {
-                            "attributes": [
-                                {
-                                    "name": "attr.worker.os.family",
-                                    "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                }
-                            ]
-                        },
+                        "hostRequirements": _HOST_REQ,
                         "script": {
                             "actions": run_actions,
                         },
@@ -367,31 +564,13 @@ class TestJobSubmission:
             },
         )
 
-        @backoff.on_predicate(
-            wait_gen=backoff.constant,
-            max_time=120,
-            interval=10,
-        )
-        def is_job_started(current_job: Job) -> bool:
-            current_job.refresh_job_info(client=deadline_client)
-            LOG.info(f"Waiting for job {current_job.id} to be created")
-            return current_job.lifecycle_status != "CREATE_IN_PROGRESS"
+        wait_for_job_created(deadline_client, job)
 
-        assert is_job_started(job)
-
-        @backoff.on_predicate(
-            wait_gen=backoff.constant,
-            max_time=120,
-            interval=10,
+        # The session list is empty, so falsy, until one exists
+        sessions: list[dict[str, Any]] = poll_until(
+            functools.partial(get_job_sessions, deadline_client, job), max_time_s=120
         )
-        def sessions_exist(current_job: Job) -> bool:
-            sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-                farmId=current_job.farm.id, queueId=current_job.queue.id, jobId=current_job.id
-            ).get("sessions")
-
-            return len(sessions) > 0
-
-        assert sessions_exist(job)
+        assert sessions
 
         deadline_client.update_job(
             farmId=job.farm.id, queueId=job.queue.id, jobId=job.id, targetTaskRunStatus="CANCELED"
@@ -404,216 +583,110 @@ class TestJobSubmission:
 
         LOG.info(f"Job result: {job}")
 
+        # The session actions seen by the latest poll, which the check after it reuses
+        last_session_actions: list[list[dict[str, Any]]] = []
+
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=1.5,
+            factor=0.2,
+            max_value=10,
             max_time=120,
-            interval=10,
+            jitter=backoff.full_jitter,
         )
         def is_expected_session_action_canceled(sessions: List[Dict[str, Any]]) -> bool:
-            found_canceled_session_action: bool = False
-            for session in sessions:
-                session_actions: list[dict[str, Any]] = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=session["sessionId"],
-                ).get("sessionActions")
-
+            nonlocal last_session_actions
+            last_session_actions = list_session_actions_by_session(deadline_client, job, sessions)
+            for session_actions in last_session_actions:
                 LOG.info(f"Session Actions: {session_actions}")
                 for session_action in session_actions:
-
                     # Session action should be canceled if it's the action we expect to be canceled
-                    if expected_canceled_action in session_action["definition"]:
-                        if session_action["status"] == "CANCELED":
-                            found_canceled_session_action = True
-                    else:
-                        assert (
-                            session_action["status"] != "CANCELED"
-                        )  # This should not happen at all, so we fast exit
-            return found_canceled_session_action
-
-        sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-            farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-        ).get("sessions")
+                    if (
+                        session_action_kind(session_action) == expected_canceled_action
+                        and session_action["status"] == "CANCELED"
+                    ):
+                        return True
+            return False
+
         assert is_expected_session_action_canceled(sessions)
 
+        # No other session action should be canceled. This reuses the session actions from the
+        # final poll above.
+        for session_actions in last_session_actions:
+            for session_action in session_actions:
+                if session_action_kind(session_action) != expected_canceled_action:
+                    assert session_action["status"] != "CANCELED"
+
     @pytest.mark.parametrize("expected_canceled_action", ["envEnter", "taskRun"])
     def test_worker_reports_canceled_session_actions_as_canceled(
         self,
         deadline_resources: DeadlineResources,
         deadline_client: DeadlineClient,
         session_worker: EC2InstanceWorker,
+        cloudwatch_logs_client: BaseClient,
         expected_canceled_action: str,
     ) -> None:
         # Tests that when running a job session action with a trap for SIGINT, the corresponding session action is canceled almost immediately.
-        action_script: str = (
-            "#!/usr/bin/env bash\n trap 'exit 0' SIGINT\n bash\n\n sleep 300\n "
-            if os.environ["OPERATING_SYSTEM"] == "linux"
-            else """try
-                {
-                    Start-Sleep -Seconds 300
-                }
-                finally
-                {
-                    Exit
-                }"""
-        )
-
         environment_exit_id = str(uuid.uuid4())
         # Submit a job that either sleeps a long time during envEnter, or taskRun, depending on the test setting
+        template: dict[str, Any] = copy.deepcopy(
+            _build_cancel_trap_template(expected_canceled_action)
+        )
+        # The environment exit message is unique to this run, so it is filled in after copying
+        template["jobEnvironments"][0]["script"]["actions"]["onExit"] = (
+            {
+                "command": "echo",
+                "args": ["Environment exit " + environment_exit_id],
+            }
+            if _IS_LINUX
+            else {
+                "command": "powershell",
+                "args": [
+                    '"Environment"',
+                    "+",
+                    '" exit "',
+                    "+",
+                    f'"{environment_exit_id}"',
+                ],
+            }
+        )
         job: Job = Job.submit(
             client=deadline_client,
             farm=deadline_resources.farm,
             queue=deadline_resources.queue_a,
             priority=98,
-            template={
-                "specificationVersion": "jobtemplate-2023-09",
-                "name": f"jobactioncanceltrap-{expected_canceled_action}",
-                "steps": [
-                    {
-                        "name": "Step0",
-                        "hostRequirements": {
-                            "attributes": [
-                                {
-                                    "name": "attr.worker.os.family",
-                                    "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                }
-                            ]
-                        },
-                        "script": {
-                            "actions": {
-                                "onRun": (
-                                    {"command": "{{ Task.File.runScript }}"}
-                                    if os.environ["OPERATING_SYSTEM"] == "linux"
-                                    else {
-                                        "command": "powershell",
-                                        "args": ["{{ Task.File.runScript }}"],
-                                    }
-                                ),
-                            },
-                            "embeddedFiles": [
-                                {
-                                    "name": "runScript",
-                                    "type": "TEXT",
-                                    "runnable": True,
-                                    "data": (
-                                        action_script
-                                        if expected_canceled_action == "taskRun"
-                                        else "whoami"
-                                    ),
-                                    **(
-                                        {"filename": "sleepscript.ps1"}
-                                        if os.environ["OPERATING_SYSTEM"] == "windows"
-                                        else {}
-                                    ),
-                                }
-                            ],
-                        },
-                    },
-                ],
-                "jobEnvironments": [
-                    {
-                        "name": "environment",
-                        "script": {
-                            "actions": {
-                                "onEnter": (
-                                    (
-                                        {"command": "{{ Env.File.runScript }}"}
-                                        if os.environ["OPERATING_SYSTEM"] == "linux"
-                                        else {
-                                            "command": "powershell",
-                                            "args": ["{{ Env.File.runScript }}"],
-                                        }
-                                    )
-                                    if expected_canceled_action == "envEnter"
-                                    else {"command": "whoami"}
-                                ),
-                                "onExit": (
-                                    (
-                                        {
-                                            "command": "echo",
-                                            "args": ["Environment exit " + environment_exit_id],
-                                        }
-                                        if os.environ["OPERATING_SYSTEM"] == "linux"
-                                        else {
-                                            "command": "powershell",
-                                            "args": [
-                                                '"Environment"',
-                                                "+",
-                                                '" exit "',
-                                                "+",
-                                                f'"{environment_exit_id}"',
-                                            ],
-                                        }
-                                    )
-                                ),
-                            },
-                            "embeddedFiles": [
-                                {
-                                    "name": "runScript",
-                                    "type": "TEXT",
-                                    "runnable": True,
-                                    "data": (
-                                        action_script
-                                        if expected_canceled_action == "envEnter"
-                                        else "whoami"
-                                    ),
-                                    **(
-                                        {"filename": "sleepscript.ps1"}
-                                        if os.environ["OPERATING_SYSTEM"] == "windows"
-                                        else {}
-                                    ),
-                                }
-                            ],
-                        },
-                    }
-                ],
-            },
-        )
-
-        @backoff.on_predicate(
-            wait_gen=backoff.constant,
-            max_time=120,
-            interval=10,
+            template=template,
         )
-        def is_job_started(current_job: Job) -> bool:
-            current_job.refresh_job_info(client=deadline_client)
-            logging.info(f"Waiting for job {current_job.id} to be created")
-            return current_job.lifecycle_status != "CREATE_IN_PROGRESS"
 
-        assert is_job_started(job)
+        wait_for_job_created(deadline_client, job)
 
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=1.5,
+            factor=0.2,
+            max_value=10,
             max_time=120,
-            interval=10,
+            jitter=backoff.full_jitter,
         )
-        def action_to_cancel_has_started(current_job: Job) -> bool:
-            sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-                farmId=current_job.farm.id, queueId=current_job.queue.id, jobId=current_job.id
-            ).get("sessions")
+        def action_to_cancel_has_started(current_job: Job) -> list[dict[str, Any]]:
+            sessions: list[dict[str, Any]] = get_job_sessions(deadline_client, current_job)
 
             if len(sessions) == 0:
-                return False
-            for session in sessions:
-                session_actions: list[dict[str, Any]] = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=session["sessionId"],
-                ).get("sessionActions")
-
+                return []
+            for session_actions in list_session_actions_by_session(deadline_client, job, sessions):
                 logging.info(f"Session Actions: {session_actions}")
                 for session_action in session_actions:
 
                     # Session action should be canceled if it's the action we expect to be canceled
-                    if expected_canceled_action in session_action["definition"]:
+                    if session_action_kind(session_action) == expected_canceled_action:
                         if session_action["status"] == "RUNNING":
-                            return True
-            return False
+                            return sessions
+            return []
 
-        # Wait for the sleep action that we want to cancel to start, before canceling it
-        assert action_to_cancel_has_started(job)
+        # Wait for the sleep action that we want to cancel to start, before canceling it. The
+        # sessions it saw are reused below rather than listed again.
+        sessions: list[dict[str, Any]] = action_to_cancel_has_started(job)
+        assert sessions
 
         deadline_client.update_job(
             farmId=job.farm.id, queueId=job.queue.id, jobId=job.id, targetTaskRunStatus="CANCELED"
@@ -621,39 +694,40 @@ class TestJobSubmission:
 
         # Check that the expected actions should be canceled way before the sleep ends.
 
+        # The session actions seen by the latest poll, which the check after it reuses
+        last_session_actions: list[list[dict[str, Any]]] = []
+
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=1.5,
+            factor=0.2,
+            max_value=10,
             max_time=60,
-            interval=5,
+            jitter=backoff.full_jitter,
         )
         def is_expected_session_action_canceled(sessions) -> bool:
-            found_canceled_session_action: bool = False
-            for session in sessions:
-                session_actions: list[dict[str, Any]] = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=session["sessionId"],
-                ).get("sessionActions")
-
+            nonlocal last_session_actions
+            last_session_actions = list_session_actions_by_session(deadline_client, job, sessions)
+            for session_actions in last_session_actions:
                 logging.info(f"Session Actions: {session_actions}")
                 for session_action in session_actions:
-
                     # Session action should be canceled if it's the action we expect to be canceled
-                    if expected_canceled_action in session_action["definition"]:
-                        if session_action["status"] == "CANCELED":
-                            found_canceled_session_action = True
-                    else:
-                        assert (
-                            session_action["status"] != "CANCELED"
-                        )  # This should not happen at all, so we fast exit
-            return found_canceled_session_action
-
-        sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-            farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-        ).get("sessions")
+                    if (
+                        session_action_kind(session_action) == expected_canceled_action
+                        and session_action["status"] == "CANCELED"
+                    ):
+                        return True
+            return False
+
         assert is_expected_session_action_canceled(sessions)
 
+        # No other session action should be canceled. This reuses the session actions from the
+        # final poll above.
+        for session_actions in last_session_actions:
+            for session_action in session_actions:
+                if session_action_kind(session_action) != expected_canceled_action:
+                    assert session_action["status"] != "CANCELED"
+
         # Wait until the job is completed
 
         job.wait_until_complete(client=deadline_client)
@@ -662,11 +736,8 @@ class TestJobSubmission:
         if expected_canceled_action == "taskRun":
             job.assert_single_task_log_contains(
                 deadline_client=deadline_client,
-                logs_client=boto3.client(
-                    "logs",
-                    config=botocore.config.Config(retries={"max_attempts": 10, "mode": "adaptive"}),
-                ),
-                expected_pattern=rf'{"Environment exit " + environment_exit_id}',
+                logs_client=cloudwatch_logs_client,
+                expected_pattern=re.compile("Environment exit " + re.escape(environment_exit_id)),
             )
 
         # Test that worker continues polling for work
@@ -693,105 +764,60 @@ class TestJobSubmission:
         deadline_client: DeadlineClient,
         session_worker: EC2InstanceWorker,
         tmp_path,
+        job_bundle_config: ConfigParser,
     ) -> None:
         # Test that when syncing input job attachments and the user cancels the job, the syncInputJobAttachments session actions are canceled
         # Create the template file, the job won't actually do anything substantial
         job_parameters: List[Dict[str, str]] = [
             {"name": "DataDir", "value": tmp_path},
         ]
-        with open(os.path.join(tmp_path, "template.json"), "w+") as template_file:
-            template_file.write(
-                json.dumps(
-                    {
-                        "specificationVersion": "jobtemplate-2023-09",
-                        "name": "SyncInputsJob",
-                        "parameterDefinitions": [
-                            {
-                                "name": "DataDir",
-                                "type": "PATH",
-                                "dataFlow": "INOUT",
-                            },
-                        ],
-                        "steps": [
-                            {
-                                "name": "WhoamiStep",
-                                "hostRequirements": {
-                                    "attributes": [
-                                        {
-                                            "name": "attr.worker.os.family",
-                                            "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                        }
-                                    ]
-                                },
-                                "script": {
-                                    "actions": {"onRun": {"command": "whoami"}},
-                                },
-                            }
-                        ],
-                    }
-                )
-            )
+        _write_template(tmp_path, _SYNC_INPUTS_TEMPLATE)
         # Create the input files to make sync inputs take a relatively long time
         files_path: str = os.path.join(tmp_path, "files")
         os.mkdir(files_path)
-        for i in range(2000):
-            file_name: str = os.path.join(files_path, f"input_file_{i+1}.txt")
-            with open(file_name, "w+") as input_file:
-                input_file.write(f"{i}")
-        config = configparser.ConfigParser()
 
-        set_setting("defaults.farm_id", deadline_resources.farm.id, config)
-        set_setting("defaults.queue_id", deadline_resources.queue_a.id, config)
+        write_small_files(
+            files_path, {b"input_file_%d.txt" % (i + 1): b"%d" % i for i in range(2000)}
+        )
 
         job_id: Optional[str] = api.create_job_from_job_bundle(
             tmp_path,
             job_parameters,
             priority=99,
-            config=config,
+            config=job_bundle_config,
             queue_parameter_definitions=[],
         )
 
         assert job_id is not None
-        job_details: dict[str, Any] = Job.get_job_details(
-            client=deadline_client,
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            job_id=job_id,
-        )
-        job: Job = Job(
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            template={},
-            **job_details,
+        job: Job = get_job(
+            deadline_client, deadline_resources.farm, deadline_resources.queue_a, job_id
         )
 
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=2,
+            factor=0.25,
+            max_value=4,
+            jitter=backoff.full_jitter,
             max_time=60,
-            interval=2,
         )
-        def sync_input_action_started(current_job: Job) -> bool:
-            sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-                farmId=current_job.farm.id, queueId=current_job.queue.id, jobId=current_job.id
-            ).get("sessions")
-            if len(sessions) == 0:
-                return False
-            for session in sessions:
-                session_actions: list[dict[str, Any]] = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=session["sessionId"],
-                ).get("sessionActions")
-                logging.info(f"Session actions: {session_actions}")
-                for session_action in session_actions:
-                    if "syncInputJobAttachments" in session_action["definition"]:
-                        if session_action["status"] in ["ASSIGNED", "RUNNING"]:
-                            return True
-            return False
+        def sync_input_action_started(current_job: Job) -> list[dict[str, Any]]:
+            # Returns the sessions it found the action in, so they can be reused after canceling
+            sessions: list[dict[str, Any]] = get_job_sessions(deadline_client, current_job)
+            sync_input_action: Optional[dict[str, Any]] = find_session_action(
+                deadline_client,
+                current_job,
+                sessions,
+                lambda session_action: (
+                    session_action_kind(session_action) == "syncInputJobAttachments"
+                    and session_action["status"] in ["ASSIGNED", "RUNNING"]
+                ),
+            )
+            return sessions if sync_input_action is not None else []
 
-        # Wait until the sync input action has started
-        assert sync_input_action_started(job)
+        # Wait until the sync input action has started, then cancel straight away
+        sessions: list[dict[str, Any]] = sync_input_action_started(job)
+        assert sessions
 
         deadline_client.update_job(
             farmId=job.farm.id,
@@ -804,43 +830,42 @@ class TestJobSubmission:
         job.wait_until_complete(client=deadline_client)
 
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=2,
+            factor=1,
+            max_value=10,
+            jitter=backoff.full_jitter,
             max_time=120,
-            interval=10,
         )
         def sync_input_actions_are_canceled(sessions: List[Dict[str, Any]]) -> bool:
-            found_canceled_sync_input_action: bool = False
-            for session in sessions:
-                session_actions = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=session["sessionId"],
-                ).get("sessionActions")
-                logging.info(f"Session actions: {session_actions}")
-                for session_action in session_actions:
-                    # Session action should be canceled if it's the action we expect to be canceled
-                    if "syncInputJobAttachments" in session_action["definition"]:
-                        if session_action["status"] == "CANCELED":
-                            found_canceled_sync_input_action = True
-                    else:
-                        assert (
-                            session_action["status"] == "SUCCEEDED"
-                            or session_action["status"] == "NEVER_ATTEMPTED"
-                        )
-            return found_canceled_sync_input_action
-
-        sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-            farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-        ).get("sessions")
+            return (
+                find_session_action(
+                    deadline_client,
+                    job,
+                    sessions,
+                    lambda session_action: (
+                        session_action_kind(session_action) == "syncInputJobAttachments"
+                        and session_action["status"] == "CANCELED"
+                    ),
+                )
+                is not None
+            )
 
         assert sync_input_actions_are_canceled(sessions)
 
+        # Every other session action should have finished normally or never run. This is checked
+        # once the cancelation has been seen rather than on every poll.
+        for session_actions in list_session_actions_by_session(deadline_client, job, sessions):
+            for session_action in session_actions:
+                if session_action_kind(session_action) != "syncInputJobAttachments":
+                    assert session_action["status"] in ["SUCCEEDED", "NEVER_ATTEMPTED"]
+
     def test_worker_always_runs_env_exit_despite_failure(
         self,
         deadline_resources: DeadlineResources,
         deadline_client: DeadlineClient,
         session_worker: EC2InstanceWorker,
+        session_action_cache: SessionActionCache,
     ) -> None:
         # Tests that whenever a envEnter on a job is attempted, the corresponding envExit is also ran despite session action failures
 
@@ -877,14 +902,7 @@ class TestJobSubmission:
                 "steps": [
                     {
                         "name": "Step0",
-                        "hostRequirements": {
-                            "attributes": [
-                                {
-                                    "name": "attr.worker.os.family",
-                                    "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                }
-                            ]
-                        },
+                        "hostRequirements": _HOST_REQ,
                         "script": {
                             "actions": {
                                 "onRun": ({"command": "whoami"}),
@@ -899,133 +917,47 @@ class TestJobSubmission:
         # Wait until the job is completed
         job.wait_until_complete(client=deadline_client)
 
-        sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-            farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-        ).get("sessions")
+        sessions: list[dict[str, Any]] = get_job_sessions(deadline_client, job)
 
         # Find that the both the unsuccessful and successful environment ran, with envExit and envEnter for each.
+        expected_statuses: dict[tuple[str, str], str] = {
+            ("envEnter", successful_environment_name): "SUCCEEDED",
+            ("envExit", successful_environment_name): "SUCCEEDED",
+            ("envEnter", unsuccessful_environment_name): "FAILED",
+            ("envExit", unsuccessful_environment_name): "FAILED",
+        }
+
         @backoff.on_exception(
-            backoff.constant,
+            backoff.expo,
             Exception,
+            base=2,
+            factor=0.25,
+            max_value=4,
+            jitter=backoff.full_jitter,
             max_time=60,
-            interval=2,
         )
         def check_environment_action_statuses_are_expected() -> None:
-            found_successful_env_enter: bool = False
-            found_unsuccessful_env_enter: bool = False
-            found_unsuccessful_env_exit: bool = False
-            found_successful_env_exit: bool = False
-            for session in sessions:
-
-                session_actions: list[dict[str, Any]] = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=session["sessionId"],
-                ).get("sessionActions")
+            found: set[tuple[str, str]] = set()
+            for session_actions in list_session_actions_by_session(
+                deadline_client, job, sessions, session_action_cache=session_action_cache
+            ):
                 logging.info(f"Session actions: {session_actions}")
                 for session_action in session_actions:
-                    definition = session_action["definition"]
-                    if "envEnter" in definition:
-                        if successful_environment_name in definition["envEnter"]["environmentId"]:
-                            assert session_action["status"] == "SUCCEEDED"
-                            found_successful_env_enter = True
-                        elif (
-                            unsuccessful_environment_name in definition["envEnter"]["environmentId"]
-                        ):
-                            assert session_action["status"] == "FAILED"
-                            found_unsuccessful_env_enter = True
-                    elif "envExit" in definition:
-                        if successful_environment_name in definition["envExit"]["environmentId"]:
-                            assert session_action["status"] == "SUCCEEDED"
-                            found_successful_env_exit = True
-                        elif (
-                            unsuccessful_environment_name in definition["envExit"]["environmentId"]
-                        ):
-                            assert session_action["status"] == "FAILED"
-                            found_unsuccessful_env_exit = True
-
-            assert (
-                found_successful_env_enter
-                and found_unsuccessful_env_enter
-                and found_unsuccessful_env_exit
-                and found_successful_env_exit
-            )
+                    kind: str = session_action_kind(session_action)
+                    if kind not in ("envEnter", "envExit"):
+                        continue
+                    key = (kind, environment_name(session_action["definition"][kind]))
+                    if key in expected_statuses:
+                        assert session_action["status"] == expected_statuses[key], key
+                        found.add(key)
+
+            assert found == expected_statuses.keys()
 
         check_environment_action_statuses_are_expected()
 
     @pytest.mark.parametrize(
         "job_environments",
-        [
-            (
-                [
-                    {
-                        "name": "environment_1",
-                        "script": {
-                            "actions": {
-                                "onEnter": (
-                                    {"command": "echo", "args": ["Hello!"]}
-                                    if os.environ["OPERATING_SYSTEM"] == "linux"
-                                    else {
-                                        "command": "powershell",
-                                        "args": ['"Hello"', "+", '"!"'],
-                                    }  # Separating the string is needed to prevent the expected string appearing in output logs more times than expected, as windows worker logs print the command
-                                ),
-                            },
-                        },
-                    },
-                ]
-            ),
-            (
-                [
-                    {
-                        "name": "environment_1",
-                        "script": {
-                            "actions": {
-                                "onEnter": (
-                                    {"command": "echo", "args": ["Hello!"]}
-                                    if os.environ["OPERATING_SYSTEM"] == "linux"
-                                    else {
-                                        "command": "powershell",
-                                        "args": ['"Hello"', "+", '"!"'],
-                                    }  # Separating the string is needed to prevent the expected string appearing in output logs more times than expected, as windows worker logs print the command
-                                ),
-                            }
-                        },
-                    },
-                    {
-                        "name": "environment_2",
-                        "script": {
-                            "actions": {
-                                "onEnter": (
-                                    {"command": "echo", "args": ["Hello!"]}
-                                    if os.environ["OPERATING_SYSTEM"] == "linux"
-                                    else {
-                                        "command": "powershell",
-                                        "args": ['"Hello"', "+", '"!"'],
-                                    }  # Separating the string is needed to prevent the expected string appearing in output logs more times than expected, as windows worker logs print the command
-                                ),
-                            }
-                        },
-                    },
-                    {
-                        "name": "environment_3",
-                        "script": {
-                            "actions": {
-                                "onEnter": (
-                                    {"command": "echo", "args": ["Hello!"]}
-                                    if os.environ["OPERATING_SYSTEM"] == "linux"
-                                    else {
-                                        "command": "powershell",
-                                        "args": ['"Hello"', "+", '"!"'],
-                                    }  # Separating the string is needed to prevent the expected string appearing in output logs more times than expected, as windows worker logs print the command
-                                ),
-                            }
-                        },
-                    },
-                ]
-            ),
-        ],
+        [pytest.param(_mk_envs(1), id="1-env"), pytest.param(_mk_envs(3), id="3-envs")],
     )
     def test_worker_run_with_number_of_environments(
         self,
@@ -1033,6 +965,7 @@ class TestJobSubmission:
         deadline_client: DeadlineClient,
         session_worker: EC2InstanceWorker,
         job_environments: List[Dict[str, Any]],
+        cloudwatch_logs_client: BaseClient,
     ) -> None:
         job_template: dict[str, Any] = {
             "specificationVersion": "jobtemplate-2023-09",
@@ -1040,14 +973,7 @@ class TestJobSubmission:
             "steps": [
                 {
                     "name": "Step0",
-                    "hostRequirements": {
-                        "attributes": [
-                            {
-                                "name": "attr.worker.os.family",
-                                "allOf": [os.environ["OPERATING_SYSTEM"]],
-                            }
-                        ]
-                    },
+                    "hostRequirements": _HOST_REQ,
                     "script": {
                         "actions": {
                             "onRun": {
@@ -1074,15 +1000,10 @@ class TestJobSubmission:
 
         assert job.task_run_status == TaskStatus.SUCCEEDED
 
-        logs_client = boto3.client(
-            "logs",
-            config=botocore.config.Config(retries={"max_attempts": 10, "mode": "adaptive"}),
-        )
-
         if len(job_environments) == 1:
             job.assert_single_task_log_contains(
                 deadline_client=deadline_client,
-                logs_client=logs_client,
+                logs_client=cloudwatch_logs_client,
                 # pass in alldot pattern
                 expected_pattern=r"Hello!",
                 assert_fail_msg="Expected Number of Hello statements not found in job logs.",
@@ -1091,8 +1012,8 @@ class TestJobSubmission:
         if len(job_environments) == 3:
             job.assert_single_task_log_contains(
                 deadline_client=deadline_client,
-                logs_client=logs_client,
-                expected_pattern=re.compile(r"Hello!.*Hello!.*Hello!", re.DOTALL),
+                logs_client=cloudwatch_logs_client,
+                expected_pattern=_HELLO_3X,
                 assert_fail_msg="Expected Number of Hello statements not found in job logs.",
             )
 
@@ -1101,6 +1022,7 @@ class TestJobSubmission:
         deadline_resources: DeadlineResources,
         deadline_client: DeadlineClient,
         session_worker: EC2InstanceWorker,
+        cloudwatch_logs_client: BaseClient,
     ) -> None:
 
         job_start_time_seconds: float = time.time()
@@ -1115,19 +1037,12 @@ class TestJobSubmission:
                 "steps": [
                     {
                         "name": "Step0",
-                        "hostRequirements": {
-                            "attributes": [
-                                {
-                                    "name": "attr.worker.os.family",
-                                    "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                }
-                            ]
-                        },
+                        "hostRequirements": _HOST_REQ,
                         "script": {
                             "actions": {
                                 "onRun": (
                                     {"command": "echo", "args": ["HelloWorld"]}
-                                    if os.environ["OPERATING_SYSTEM"] == "linux"
+                                    if _IS_LINUX
                                     else {
                                         "command": "powershell",
                                         "args": ['"Hello"', "+", '"World"'],
@@ -1142,16 +1057,11 @@ class TestJobSubmission:
 
         job.wait_until_complete(client=deadline_client)
 
-        logs_client = boto3.client(
-            "logs",
-            config=botocore.config.Config(retries={"max_attempts": 10, "mode": "adaptive"}),
-        )
-
         # Retrieve job output and verify the echo is printed
 
         job.assert_single_task_log_contains(
             deadline_client=deadline_client,
-            logs_client=logs_client,
+            logs_client=cloudwatch_logs_client,
             expected_pattern=r"HelloWorld",
         )
 
@@ -1163,240 +1073,187 @@ class TestJobSubmission:
         assert worker_id is not None
 
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=2,
+            factor=0.25,
+            max_value=4,
+            jitter=backoff.full_jitter,
             max_time=120,
-            interval=2,
         )
         def check_for_worker_log_event() -> bool:
-            worker_logs = logs_client.get_log_events(
+            # Only whether an event exists matters, so fetch at most one instead of a full page
+            worker_logs = cloudwatch_logs_client.get_log_events(
                 logGroupName=worker_log_group_name,
                 logStreamName=worker_id,
                 startTime=int(job_start_time_seconds * 1000),
+                startFromHead=True,
+                limit=1,
             )
 
             return len(worker_logs["events"]) > 0
 
         assert check_for_worker_log_event(), f"Could not find a worker log for {worker_id}"
 
-    @pytest.mark.parametrize(
-        "append_string_script",
-        [
-            (
-                "#!/usr/bin/env bash\n\n  echo -n $(cat {{Param.DataDir}}/files/test_input_file){{Param.StringToAppend}} > {{Param.DataDir}}/output_file\n"
-                if os.environ["OPERATING_SYSTEM"] == "linux"
-                else '''set /p input=<"{{Param.DataDir}}\\files\\test_input_file"\n powershell -Command "echo ($env:input+\'{{Param.StringToAppend}}\') | Out-File -encoding utf8 {{Param.DataDir}}\\output_file -NoNewLine"'''
-            )
-        ],
-    )
+    @pytest.mark.parametrize("append_string_script", [_APPEND_STRING_SCRIPT])
     def test_worker_uses_job_attachment_configuration(
         self,
         deadline_resources: DeadlineResources,
         deadline_client: DeadlineClient,
         session_worker: EC2InstanceWorker,
         append_string_script: str,
+        tmp_path: pathlib.Path,
+        job_bundle_config: ConfigParser,
     ) -> None:
         # Verify that the worker uses the correct job attachment configuration, and writes the output to the correct location
 
         test_run_uuid: str = str(uuid.uuid4())
 
-        job_bundle_path: str = os.path.join(
-            os.path.dirname(__file__),
-            "job_attachment_bundle",
-        )
+        # Work on a copy of the bundle so the generated template and the downloaded output stay out
+        # of the source tree, and pytest cleans both up with tmp_path
+        job_bundle_path: str = str(tmp_path / "job_attachment_bundle")
+        shutil.copytree(_JOB_ATTACHMENT_BUNDLE_PATH, job_bundle_path)
         job_parameters: List[Dict[str, str]] = [
             {"name": "StringToAppend", "value": test_run_uuid},
             {"name": "DataDir", "value": job_bundle_path},
         ]
-        try:
-            with open(os.path.join(job_bundle_path, "template.json"), "w+") as template_file:
-                template_file.write(
-                    json.dumps(
-                        {
-                            "specificationVersion": "jobtemplate-2023-09",
-                            "name": "AppendStringJob",
-                            "parameterDefinitions": [
-                                {
-                                    "name": "DataDir",
-                                    "type": "PATH",
-                                    "dataFlow": "INOUT",
-                                },
-                                {"name": "StringToAppend", "type": "STRING"},
-                            ],
-                            "steps": [
+        _write_template(
+            job_bundle_path,
+            {
+                "specificationVersion": "jobtemplate-2023-09",
+                "name": "AppendStringJob",
+                "parameterDefinitions": [
+                    {
+                        "name": "DataDir",
+                        "type": "PATH",
+                        "dataFlow": "INOUT",
+                    },
+                    {"name": "StringToAppend", "type": "STRING"},
+                ],
+                "steps": [
+                    {
+                        "name": "AppendString",
+                        "hostRequirements": _HOST_REQ,
+                        "script": {
+                            "actions": {"onRun": {"command": "{{ Task.File.runScript }}"}},
+                            "embeddedFiles": [
                                 {
-                                    "name": "AppendString",
-                                    "hostRequirements": {
-                                        "attributes": [
-                                            {
-                                                "name": "attr.worker.os.family",
-                                                "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                            }
-                                        ]
-                                    },
-                                    "script": {
-                                        "actions": {
-                                            "onRun": {"command": "{{ Task.File.runScript }}"}
-                                        },
-                                        "embeddedFiles": [
-                                            {
-                                                "name": "runScript",
-                                                "type": "TEXT",
-                                                "runnable": True,
-                                                "data": append_string_script,
-                                                **(
-                                                    {"filename": "stringappendscript.bat"}
-                                                    if os.environ["OPERATING_SYSTEM"] == "windows"
-                                                    else {}
-                                                ),
-                                            }
-                                        ],
-                                    },
+                                    "name": "runScript",
+                                    "type": "TEXT",
+                                    "runnable": True,
+                                    "data": append_string_script,
+                                    **(
+                                        {"filename": "stringappendscript.bat"}
+                                        if _IS_WINDOWS
+                                        else {}
+                                    ),
                                 }
                             ],
-                        }
-                    )
-                )
-
-            config = configparser.ConfigParser()
-
-            set_setting("defaults.farm_id", deadline_resources.farm.id, config)
-            set_setting("defaults.queue_id", deadline_resources.queue_a.id, config)
-
-            job_id: Optional[str] = api.create_job_from_job_bundle(
-                job_bundle_path,
-                job_parameters,
-                priority=99,
-                config=config,
-                queue_parameter_definitions=[],
-            )
-            assert job_id is not None
-        finally:
-            # Clean up the template file
-            os.remove(os.path.join(job_bundle_path, "template.json"))
+                        },
+                    }
+                ],
+            },
+        )
 
-        job_details: dict[str, Any] = Job.get_job_details(
-            client=deadline_client,
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            job_id=job_id,
+        job_id: Optional[str] = api.create_job_from_job_bundle(
+            job_bundle_path,
+            job_parameters,
+            priority=99,
+            config=job_bundle_config,
+            queue_parameter_definitions=[],
         )
-        job: Job = Job(
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            template={},
-            **job_details,
+        assert job_id is not None
+
+        job: Job = get_job(
+            deadline_client, deadline_resources.farm, deadline_resources.queue_a, job_id
         )
 
         output_path: dict[str, list[str]] = wait_for_job_output(
             job=job, deadline_client=deadline_client, deadline_resources=deadline_resources
         )
-
-        try:
-            with (
-                open(os.path.join(job_bundle_path, "files", "test_input_file"), "r") as input_file,
-                open(
-                    os.path.join(
-                        list(output_path.keys())[0],
-                        "output_file",
-                    ),
-                    "r",
-                    encoding="utf-8-sig",
-                ) as output_file,
-            ):
-                input_file_content: str = input_file.read()
-                output_file_content = output_file.read()
-
-                # Verify that the output file content is the input file content plus the uuid we appended in the job
-                assert output_file_content == (input_file_content + test_run_uuid)
-        finally:
-            os.remove(os.path.join(list(output_path.keys())[0], "output_file"))
+        input_file_path: str = os.path.join(job_bundle_path, "files", "test_input_file")
+        output_file_path: str = os.path.join(list(output_path.keys())[0], "output_file")
+
+        # Verify that the output file content is the input file content plus the uuid we appended in
+        # the job. Both sides are hashed so neither file has to be held in memory whole.
+        with open(input_file_path, "rb") as input_file:
+            expected_hash: str = sha256_file(input_file, test_run_uuid.encode("utf-8"))
+
+        with open(output_file_path, "rb") as output_file:
+            # Out-File on Windows writes a UTF-8 byte order mark, which is not part of the content
+            if output_file.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+                output_file.seek(0)
+            output_hash: str = sha256_file(output_file)
+
+        def describe_mismatch() -> str:
+            # Only read back in full on failure, to show what the job actually wrote
+            with open(input_file_path, "rb") as input_file:
+                expected_content: bytes = input_file.read() + test_run_uuid.encode("utf-8")
+            with open(output_file_path, "rb") as output_file:
+                output_content: bytes = output_file.read()
+            return f"Output {output_content!r} does not match expected {expected_content!r}"
+
+        assert output_hash == expected_hash, describe_mismatch()
 
     def test_worker_job_attachments_no_outputs_does_not_fail_job(
         self,
         deadline_resources: DeadlineResources,
         deadline_client: DeadlineClient,
         session_worker: EC2InstanceWorker,
+        tmp_path: pathlib.Path,
+        job_bundle_config: ConfigParser,
     ) -> None:
         # Tests that if a job has no job output files in the output directory, the job does not fail. This tests prevents regressions in the output code
 
-        job_bundle_path: str = os.path.join(
-            os.path.dirname(__file__),
-            "job_attachment_bundle",
-        )
+        # Generate the template in a copy of the bundle rather than in the source tree
+        job_bundle_path: str = str(tmp_path / "job_attachment_bundle")
+        shutil.copytree(_JOB_ATTACHMENT_BUNDLE_PATH, job_bundle_path)
 
-        try:
-            with (
-                open(os.path.join(job_bundle_path, "template.json"), "w+") as template_file,
-                tempfile.TemporaryDirectory() as temporary_output_directory,
-            ):
+        with tempfile.TemporaryDirectory() as temporary_output_directory:
 
-                job_parameters: List[Dict[str, str]] = [
-                    {
-                        "name": "OutputFilePath",
-                        "value": temporary_output_directory,
-                    },
-                ]
+            job_parameters: List[Dict[str, str]] = [
+                {
+                    "name": "OutputFilePath",
+                    "value": temporary_output_directory,
+                },
+            ]
 
-                template_file.write(
-                    json.dumps(
+            _write_template(
+                job_bundle_path,
+                {
+                    "specificationVersion": "jobtemplate-2023-09",
+                    "name": "NoOutputJob",
+                    "parameterDefinitions": [
                         {
-                            "specificationVersion": "jobtemplate-2023-09",
-                            "name": "NoOutputJob",
-                            "parameterDefinitions": [
-                                {
-                                    "name": "OutputFilePath",
-                                    "type": "PATH",
-                                    "objectType": "DIRECTORY",
-                                    "dataFlow": "OUT",
-                                },
-                            ],
-                            "steps": [
-                                {
-                                    "name": "MainStep",
-                                    "hostRequirements": {
-                                        "attributes": [
-                                            {
-                                                "name": "attr.worker.os.family",
-                                                "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                            }
-                                        ]
-                                    },
-                                    "script": {
-                                        "actions": {"onRun": {"command": "whoami"}},
-                                    },
-                                }
-                            ],
+                            "name": "OutputFilePath",
+                            "type": "PATH",
+                            "objectType": "DIRECTORY",
+                            "dataFlow": "OUT",
+                        },
+                    ],
+                    "steps": [
+                        {
+                            "name": "MainStep",
+                            "hostRequirements": _HOST_REQ,
+                            "script": {
+                                "actions": {"onRun": {"command": "whoami"}},
+                            },
                         }
-                    )
-                )
-                config = configparser.ConfigParser()
-
-            set_setting("defaults.farm_id", deadline_resources.farm.id, config)
-            set_setting("defaults.queue_id", deadline_resources.queue_a.id, config)
-            job_id: Optional[str] = api.create_job_from_job_bundle(
-                job_bundle_path,
-                job_parameters,
-                priority=99,
-                config=config,
-                queue_parameter_definitions=[],
-                require_paths_exist=True,
+                    ],
+                },
             )
-            assert job_id is not None
-        finally:
-            # Clean up the template file
-            os.remove(os.path.join(job_bundle_path, "template.json"))
 
-        job_details = Job.get_job_details(
-            client=deadline_client,
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            job_id=job_id,
+        job_id: Optional[str] = api.create_job_from_job_bundle(
+            job_bundle_path,
+            job_parameters,
+            priority=99,
+            config=job_bundle_config,
+            queue_parameter_definitions=[],
+            require_paths_exist=True,
         )
-        job = Job(
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            template={},
-            **job_details,
+        assert job_id is not None
+
+        job: Job = get_job(
+            deadline_client, deadline_resources.farm, deadline_resources.queue_a, job_id
         )
         job.wait_until_complete(client=deadline_client)
 
@@ -1408,123 +1265,95 @@ class TestJobSubmission:
         deadline_resources: DeadlineResources,
         session_worker: EC2InstanceWorker,
         deadline_client: DeadlineClient,
+        job_bundle_config: ConfigParser,
+        tmp_path: pathlib.Path,
     ) -> None:
         # Test that when submitting a job with job attachments to a queue with a role that cannot read the S3 bucket, the worker will fail the job attachments sync
 
-        job_bundle_path: str = os.path.join(
-            os.path.dirname(__file__),
-            "job_attachment_bundle",
-        )
+        # Generate the template in a copy of the bundle rather than in the source tree
+        job_bundle_path: str = str(tmp_path / "job_attachment_bundle")
+        shutil.copytree(_JOB_ATTACHMENT_BUNDLE_PATH, job_bundle_path)
         job_parameters: List[Dict[str, str]] = [
             {"name": "DataDir", "value": job_bundle_path},
         ]
-        append_string_script = (
-            "#!/usr/bin/env bash\n\n  echo -n $(cat {{Param.DataDir}}/files/test_input_file)hi > {{Param.DataDir}}/output_file\n"
-            if os.environ["OPERATING_SYSTEM"] == "linux"
-            else '''set /p input=<"{{Param.DataDir}}\\files\\test_input_file"\n powershell -Command "echo ($env:input+\'hi\') | Out-File -encoding utf8 {{Param.DataDir}}\\output_file -NoNewLine"'''
-        )
-
-        try:
-            with open(os.path.join(job_bundle_path, "template.json"), "w+") as template_file:
-                template_file.write(
-                    json.dumps(
-                        {
-                            "specificationVersion": "jobtemplate-2023-09",
-                            "name": "JobAttachmentToNonValidRoleQueue",
-                            "parameterDefinitions": [
-                                {
-                                    "name": "DataDir",
-                                    "type": "PATH",
-                                    "dataFlow": "INOUT",
-                                },
-                            ],
-                            "steps": [
+        _write_template(
+            job_bundle_path,
+            {
+                "specificationVersion": "jobtemplate-2023-09",
+                "name": "JobAttachmentToNonValidRoleQueue",
+                "parameterDefinitions": [
+                    {
+                        "name": "DataDir",
+                        "type": "PATH",
+                        "dataFlow": "INOUT",
+                    },
+                ],
+                "steps": [
+                    {
+                        "name": "Step0",
+                        "hostRequirements": _HOST_REQ,
+                        "script": {
+                            "actions": {"onRun": {"command": "{{ Task.File.runScript }}"}},
+                            "embeddedFiles": [
                                 {
-                                    "name": "Step0",
-                                    "hostRequirements": {
-                                        "attributes": [
-                                            {
-                                                "name": "attr.worker.os.family",
-                                                "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                            }
-                                        ]
-                                    },
-                                    "script": {
-                                        "actions": {
-                                            "onRun": {"command": "{{ Task.File.runScript }}"}
-                                        },
-                                        "embeddedFiles": [
-                                            {
-                                                "name": "runScript",
-                                                "type": "TEXT",
-                                                "runnable": True,
-                                                "data": append_string_script,
-                                                **(
-                                                    {"filename": "stringappendscript.bat"}
-                                                    if os.environ["OPERATING_SYSTEM"] == "windows"
-                                                    else {}
-                                                ),
-                                            }
-                                        ],
-                                    },
+                                    "name": "runScript",
+                                    "type": "TEXT",
+                                    "runnable": True,
+                                    "data": _APPEND_HI_SCRIPT,
+                                    **(
+                                        {"filename": "stringappendscript.bat"}
+                                        if _IS_WINDOWS
+                                        else {}
+                                    ),
                                 }
                             ],
-                        }
-                    )
-                )
-
-            config = configparser.ConfigParser()
-
-            set_setting("defaults.farm_id", deadline_resources.farm.id, config)
-            set_setting("defaults.queue_id", deadline_resources.non_valid_role_queue.id, config)
+                        },
+                    }
+                ],
+            },
+        )
 
-            job_id: Optional[str] = api.create_job_from_job_bundle(
-                job_bundle_path,
-                job_parameters,
-                priority=99,
-                config=config,
-                queue_parameter_definitions=[],
-            )
-            assert job_id is not None
-        finally:
-            # Clean up the template file
-            os.remove(os.path.join(job_bundle_path, "template.json"))
+        set_setting(
+            "defaults.queue_id", deadline_resources.non_valid_role_queue.id, job_bundle_config
+        )
 
-        job_details = Job.get_job_details(
-            client=deadline_client,
-            farm=deadline_resources.farm,
-            queue=deadline_resources.non_valid_role_queue,
-            job_id=job_id,
+        job_id: Optional[str] = api.create_job_from_job_bundle(
+            job_bundle_path,
+            job_parameters,
+            priority=99,
+            config=job_bundle_config,
+            queue_parameter_definitions=[],
         )
-        job = Job(
-            farm=deadline_resources.farm,
-            queue=deadline_resources.non_valid_role_queue,
-            template={},
-            **job_details,
+        assert job_id is not None
+
+        job: Job = get_job(
+            deadline_client,
+            deadline_resources.farm,
+            deadline_resources.non_valid_role_queue,
+            job_id,
         )
 
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=2,
+            factor=1.5,
+            max_value=10,
+            jitter=backoff.full_jitter,
             max_time=120,
-            interval=10,
         )
         def sync_input_job_attachments_failed(current_job: Job) -> bool:
-            sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-                farmId=current_job.farm.id, queueId=current_job.queue.id, jobId=current_job.id
-            ).get("sessions")
-
-            if sessions:
-                session_actions = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=sessions[0]["sessionId"],
-                ).get("sessionActions")
-
-                for session_action in session_actions:
-                    if "syncInputJobAttachments" in session_action["definition"]:
-                        return session_action["status"] == "FAILED"
-            return False
+            sessions: list[dict[str, Any]] = get_job_sessions(deadline_client, current_job)
+            # Any session's failed sync ends the wait, whichever response arrives first
+            failed_sync_input_action: Optional[dict[str, Any]] = find_session_action(
+                deadline_client,
+                current_job,
+                sessions,
+                lambda session_action: (
+                    session_action_kind(session_action) == "syncInputJobAttachments"
+                    and session_action["status"] == "FAILED"
+                ),
+            )
+            return failed_sync_input_action is not None
 
         # Check that the syncInputJobAttachments action failed, since the queue does not have a queue role
 
@@ -1532,34 +1361,7 @@ class TestJobSubmission:
 
         return
 
-    @pytest.mark.parametrize(
-        "hash_string_script",
-        [
-            (
-                "#!/usr/bin/env bash\n\n"
-                "folder_path={{Param.DataDir}}/files\n"
-                'combined_contents=""\n'
-                'for file in "$folder_path"/*; do\n'
-                '   if [ -f "$file" ]; then\n'
-                '   combined_contents+="$(cat "$file" | tr -d \'\\n\')"\n'
-                "   fi\n"
-                "done\n"
-                "sha256_hash=$(echo -n \"$combined_contents\" | sha256sum | awk '{ print $1 }')\n"
-                'echo -n "$sha256_hash" > {{Param.DataDir}}/output_file.txt'
-                if os.environ["OPERATING_SYSTEM"] == "linux"
-                else '$InputFolder = "{{Param.DataDir}}\\files"\n'
-                '$OutputFile = "{{Param.DataDir}}\\output_file.txt"\n'
-                '$combinedContent = ""\n'
-                "$files = Get-ChildItem -Path $InputFolder -File\n"
-                "foreach ($file in $files) {\n"
-                "   $combinedContent += [IO.File]::ReadAllText($file.FullName)\n"
-                "}\n"
-                "$sha256 = [System.Security.Cryptography.SHA256]::Create().ComputeHash([System.Text.Encoding]::UTF8.GetBytes($combinedContent))\n"
-                '$hashString = [System.BitConverter]::ToString($sha256).Replace("-", "").ToLower()\n'
-                "Set-Content -Path $OutputFile -Value $hashString -NoNewLine"
-            )
-        ],
-    )
+    @pytest.mark.parametrize("hash_string_script", [_HASH_SCRIPT])
     def test_worker_uses_job_attachment_sync(
         self,
         deadline_resources: DeadlineResources,
@@ -1567,154 +1369,109 @@ class TestJobSubmission:
         session_worker: EC2InstanceWorker,
         hash_string_script: str,
         tmp_path: pathlib.Path,
+        job_bundle_config: ConfigParser,
+        many_small_files: tuple[pathlib.Path, str],
     ) -> None:
         # Verify that the worker sync job attachment correctly and report the progress correctly as well
 
+        files_dir, combined_hash = many_small_files
         job_bundle_path: str = os.path.join(
             tmp_path,
             "job_attachment_bundle_large",
         )
-        file_path: str = os.path.join(job_bundle_path, "files")
-
-        os.mkdir(job_bundle_path)
-        os.mkdir(file_path)
-
-        # Create 2500 very small files to transfer
-        for i in range(2500):
-            file_name: str = os.path.join(file_path, f"file_{i+1}.txt")
-            with open(file_name, "w") as file_to_write:
-                file_to_write.write(str(i))
-
-        # Calculate the hash of all the files content combine
-        combined_string: str = ""
-        for file_name in sorted(os.listdir(file_path)):
-            file: str = os.path.join(file_path, file_name)
-            # Open the file and read its contents
-            with open(file, "r") as file_string:
-                file_contents: str = file_string.read()
-
-            # Concatenate the file contents to the combined string
-            combined_string += file_contents
-
-        combined_hash: str = hashlib.sha256(combined_string.encode()).hexdigest()
+        # The copy is what gets uploaded, and template.json below is written next to it
+        shutil.copytree(files_dir, os.path.join(job_bundle_path, "files"))
 
         # JA template to get all files and compute the hash
         job_parameters: List[Dict[str, str]] = [
             {"name": "DataDir", "value": job_bundle_path},
         ]
-        with open(os.path.join(job_bundle_path, "template.json"), "w+") as template_file:
-            template_file.write(
-                json.dumps(
+        _write_template(
+            job_bundle_path,
+            {
+                "specificationVersion": "jobtemplate-2023-09",
+                "name": "AssetsSync",
+                "parameterDefinitions": [
+                    {
+                        "name": "DataDir",
+                        "type": "PATH",
+                        "dataFlow": "INOUT",
+                    },
+                ],
+                "steps": [
                     {
-                        "specificationVersion": "jobtemplate-2023-09",
-                        "name": "AssetsSync",
-                        "parameterDefinitions": [
-                            {
-                                "name": "DataDir",
-                                "type": "PATH",
-                                "dataFlow": "INOUT",
+                        "name": "HashString",
+                        "hostRequirements": _HOST_REQ,
+                        "script": {
+                            "actions": {
+                                "onRun": (
+                                    {"command": "{{ Task.File.runScript }}"}
+                                    if _IS_LINUX
+                                    else {
+                                        "command": "powershell",
+                                        "args": ["{{ Task.File.runScript }}"],
+                                    }
+                                ),
                             },
-                        ],
-                        "steps": [
-                            {
-                                "name": "HashString",
-                                "hostRequirements": {
-                                    "attributes": [
-                                        {
-                                            "name": "attr.worker.os.family",
-                                            "allOf": [os.environ["OPERATING_SYSTEM"]],
-                                        }
-                                    ]
-                                },
-                                "script": {
-                                    "actions": {
-                                        "onRun": (
-                                            {"command": "{{ Task.File.runScript }}"}
-                                            if os.environ["OPERATING_SYSTEM"] == "linux"
-                                            else {
-                                                "command": "powershell",
-                                                "args": ["{{ Task.File.runScript }}"],
-                                            }
-                                        ),
-                                    },
-                                    "embeddedFiles": [
-                                        {
-                                            "name": "runScript",
-                                            "type": "TEXT",
-                                            "runnable": True,
-                                            "data": hash_string_script,
-                                            **(
-                                                {"filename": "hashscript.ps1"}
-                                                if os.environ["OPERATING_SYSTEM"] == "windows"
-                                                else {}
-                                            ),
-                                        }
-                                    ],
-                                },
-                            }
-                        ],
+                            "embeddedFiles": [
+                                {
+                                    "name": "runScript",
+                                    "type": "TEXT",
+                                    "runnable": True,
+                                    "data": hash_string_script,
+                                    **({"filename": "hashscript.ps1"} if _IS_WINDOWS else {}),
+                                }
+                            ],
+                        },
                     }
-                )
-            )
-
-        config = configparser.ConfigParser()
-
-        set_setting("defaults.farm_id", deadline_resources.farm.id, config)
-        set_setting("defaults.queue_id", deadline_resources.queue_a.id, config)
+                ],
+            },
+        )
 
         job_id: Optional[str] = api.create_job_from_job_bundle(
             job_bundle_path,
             job_parameters,
             priority=99,
             max_retries_per_task=0,
-            config=config,
+            config=job_bundle_config,
             queue_parameter_definitions=[],
         )
         assert job_id is not None
 
-        job_details = Job.get_job_details(
-            client=deadline_client,
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            job_id=job_id,
-        )
-        job = Job(
-            farm=deadline_resources.farm,
-            queue=deadline_resources.queue_a,
-            template={},
-            **job_details,
+        job: Job = get_job(
+            deadline_client, deadline_resources.farm, deadline_resources.queue_a, job_id
         )
 
         # Query the session to check for progress percentage
         complete_percentage: float = 0
+        # The job has a single task, so once its session shows up it is the only one to watch
+        sessions: list[dict[str, Any]] = []
 
         @backoff.on_predicate(
             wait_gen=backoff.constant,
             max_time=120,
             interval=2,
         )
-        def check_percentage(complete_percentage) -> bool:
-            sessions = deadline_client.list_sessions(
-                farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-            ).get("sessions")
-
-            if sessions:
-                session_actions = deadline_client.list_session_actions(
-                    farmId=job.farm.id,
-                    queueId=job.queue.id,
-                    jobId=job.id,
-                    sessionId=sessions[0]["sessionId"],
-                ).get("sessionActions")
-
-                for session_action in session_actions:
-                    if "syncInputJobAttachments" in session_action["definition"]:
-                        assert complete_percentage <= session_action["progressPercent"]
-                        complete_percentage = session_action["progressPercent"]
-                        return complete_percentage == 100
+        def check_percentage() -> bool:
+            nonlocal complete_percentage, sessions
+            if not sessions:
+                sessions = get_job_sessions(deadline_client, job)
+            sync_input_action: Optional[dict[str, Any]] = find_session_action(
+                deadline_client,
+                job,
+                sessions,
+                lambda session_action: (
+                    session_action_kind(session_action) == "syncInputJobAttachments"
+                ),
+            )
+            if sync_input_action is not None:
+                assert complete_percentage <= sync_input_action["progressPercent"]
+                complete_percentage = sync_input_action["progressPercent"]
+                return complete_percentage == 100
 
             return False
 
-        assert check_percentage(complete_percentage)
+        assert check_percentage()
 
         output_path: dict[str, list[str]] = wait_for_job_output(
             job=job, deadline_client=deadline_client, deadline_resources=deadline_resources
@@ -1737,37 +1494,12 @@ class TestJobSubmission:
 
         # Submit a job with a task that sleeps for 60 seconds , which is more than the UpdateWorkerSchedule interval of 30 seconds
 
-        test_run_status_message: str = "Sleep job is running!"
-        sleep_script: str = (
-            f"""
-            #!/usr/bin/env bash
-            percent=0
-
-            while [ $percent -le 100 ]
-            do
-                echo "openjd_progress: $percent"
-                echo "openjd_status: {test_run_status_message}"
-                ((percent+=10))
-                sleep 6
-            done
-            """
-            if os.environ["OPERATING_SYSTEM"] == "linux"
-            else f"""
-            $percent = 0
-            while ($percent -le 100) {{
-                Write-Output "openjd_progress: $percent"
-                Write-Output "openjd_status: {test_run_status_message}"
-                $percent += 10
-                Start-Sleep -Seconds 6
-            }}
-            """
-        )
         job: Job = submit_custom_job(
             job_name="One Minute Sleep Job for Task Progress",
             deadline_client=deadline_client,
             farm=deadline_resources.farm,
             queue=deadline_resources.queue_a,
-            run_script=sleep_script,
+            run_script=_PROGRESS_SLEEP_SCRIPT,
         )
 
         @backoff.on_predicate(
@@ -1782,20 +1514,26 @@ class TestJobSubmission:
 
         assert is_job_started()
 
+        # Keep the session once it is found, so later polls only list its session actions
+        session: Optional[dict[str, Any]] = None
+
         @backoff.on_predicate(
             wait_gen=backoff.constant,
             max_time=180,
             interval=4,
         )
         def get_session_action_id() -> Optional[str]:
-            sessions: list[dict[str, Any]] = deadline_client.list_sessions(
-                farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
-            ).get("sessions")
-
-            if sessions:
-                # There should be at most 1 session as there is only one task
-                assert len(sessions) <= 1
-                session: dict[str, Any] = sessions[0]
+            nonlocal session
+            if session is None:
+                sessions: list[dict[str, Any]] = deadline_client.list_sessions(
+                    farmId=job.farm.id, queueId=job.queue.id, jobId=job.id
+                ).get("sessions")
+                if sessions:
+                    # There should be at most 1 session as there is only one task
+                    assert len(sessions) <= 1
+                    session = sessions[0]
+
+            if session is not None:
                 session_actions: list[dict[str, Any]] = deadline_client.list_session_actions(
                     farmId=job.farm.id,
                     queueId=job.queue.id,
@@ -1838,7 +1576,7 @@ class TestJobSubmission:
                 "RECLAIMING",
                 "RECLAIMED",
             ]
-            if progress_percent > 0 and progress_message == test_run_status_message:
+            if progress_percent > 0 and progress_message == _PROGRESS_STATUS_MESSAGE:
                 return True
             return False
 
@@ -1853,16 +1591,7 @@ class TestJobSubmission:
         deadline_resources: DeadlineResources,
         deadline_client: DeadlineClient,
         function_worker: EC2InstanceWorker,
-        sleep_script: str = (
-            """
-            #!/usr/bin/env bash
-            sleep 600
-            """
-            if os.environ["OPERATING_SYSTEM"] == "linux"
-            else """
-            Start-Sleep -Seconds 600
-            """
-        ),
+        sleep_script: str = _LONG_SLEEP_SCRIPT,
     ):
 
         job: Job = submit_custom_job(
@@ -1873,7 +1602,7 @@ class TestJobSubmission:
             run_script=sleep_script,
         )
 
-        if os.environ["OPERATING_SYSTEM"] == "linux":
+        if _IS_LINUX:
             cmd_result = function_worker.send_command("sudo systemctl stop deadline-worker")
         else:
             cmd_result = function_worker.send_command("sc.exe stop DeadlineWorker")
@@ -1881,9 +1610,12 @@ class TestJobSubmission:
         assert cmd_result.exit_code == 0
 
         @backoff.on_predicate(
-            wait_gen=backoff.constant,
+            wait_gen=backoff.expo,
+            base=2,
+            factor=1.5,
+            max_value=10,
+            jitter=backoff.full_jitter,
             max_time=120,
-            interval=10,
         )
         def worker_stop(worker: EC2InstanceWorker) -> bool:
             response = function_worker.deadline_client.get_worker(
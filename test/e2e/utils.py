@@ -1,5 +1,12 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+import hashlib
+import io
+import logging
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional, TypeVar
 
 from deadline.job_attachments._aws.deadline import get_queue
 from deadline.job_attachments import download
@@ -10,7 +17,11 @@ from deadline_test_fixtures import (
     Queue,
 )
 
-from e2e.conftest import DeadlineResources
+from e2e.conftest import DeadlineResources, SessionActionCache
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 
 def wait_for_job_output(
@@ -40,6 +51,190 @@ def wait_for_job_output(
     return output_paths_by_root
 
 
+def wait_for_job_created(deadline_client: DeadlineClient, job: Job) -> None:
+    # The service ships a JobCreateComplete waiter, so let botocore drive the GetJob polling. It
+    # also fails fast on CREATE_FAILED / UPLOAD_FAILED instead of waiting out the full timeout.
+    LOG.info(f"Waiting for job {job.id} to be created")
+    deadline_client.get_waiter("job_create_complete").wait(
+        farmId=job.farm.id,
+        queueId=job.queue.id,
+        jobId=job.id,
+        WaiterConfig={"Delay": 1, "MaxAttempts": 120},
+    )
+
+
+def poll_until(
+    predicate: Callable[[], T],
+    max_time_s: float,
+    base_s: float = 0.2,
+    multiplier: float = 1.5,
+    max_delay_s: float = 10.0,
+) -> T:
+    """
+    Calls predicate until it returns a truthy value or max_time_s elapses, and returns its last
+    result. The delay between calls grows exponentially from base_s up to max_delay_s, and each
+    sleep is drawn uniformly from [0, delay) (full jitter) so concurrent tests do not poll in step.
+    """
+    deadline = time.monotonic() + max_time_s
+    delay = base_s
+    while True:
+        result = predicate()
+        remaining = deadline - time.monotonic()
+        if result or remaining <= 0:
+            return result
+        time.sleep(min(random.uniform(0, min(delay, max_delay_s)), remaining))
+        delay *= multiplier
+
+
+def get_job(deadline_client: DeadlineClient, farm: Farm, queue: Queue, job_id: str) -> Job:
+    # For jobs created from a bundle through the deadline client API rather than Job.submit. GetJob
+    # does not return the template, so the Job is built without one.
+    return Job(
+        farm=farm,
+        queue=queue,
+        template={},
+        **Job.get_job_details(client=deadline_client, farm=farm, queue=queue, job_id=job_id),
+    )
+
+
+def get_job_sessions(
+    deadline_client: DeadlineClient,
+    job: Job,
+) -> list[dict[str, Any]]:
+    pages = deadline_client.get_paginator("list_sessions").paginate(
+        farmId=job.farm.id,
+        queueId=job.queue.id,
+        jobId=job.id,
+        PaginationConfig={"PageSize": 100},
+    )
+    return [session for page in pages for session in page["sessions"]]
+
+
+def _list_session_actions(
+    deadline_client: DeadlineClient,
+    job: Job,
+    session: dict[str, Any],
+    session_action_cache: Optional[SessionActionCache] = None,
+) -> list[dict[str, Any]]:
+    session_id: str = session["sessionId"]
+    if session_action_cache is not None:
+        final_session_actions = session_action_cache.get(session_id)
+        if final_session_actions is not None:
+            return final_session_actions
+
+    pages = deadline_client.get_paginator("list_session_actions").paginate(
+        farmId=job.farm.id,
+        queueId=job.queue.id,
+        jobId=job.id,
+        sessionId=session_id,
+        PaginationConfig={"PageSize": 100},
+    )
+    session_actions: list[dict[str, Any]] = [
+        session_action for page in pages for session_action in page["sessionActions"]
+    ]
+    if session_action_cache is not None:
+        session_action_cache.put(session_id, session_actions)
+    return session_actions
+
+
+def list_session_actions_by_session(
+    deadline_client: DeadlineClient,
+    job: Job,
+    sessions: list[dict[str, Any]],
+    session_action_cache: Optional[SessionActionCache] = None,
+) -> list[list[dict[str, Any]]]:
+    # Each session needs its own ListSessionActions call, so issue them concurrently rather than
+    # paying one round trip per session. Results are returned in the same order as sessions.
+    if not sessions:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(16, len(sessions))) as executor:
+        return list(
+            executor.map(
+                lambda session: _list_session_actions(
+                    deadline_client, job, session, session_action_cache
+                ),
+                sessions,
+            )
+        )
+
+
+def find_session_action(
+    deadline_client: DeadlineClient,
+    job: Job,
+    sessions: list[dict[str, Any]],
+    predicate: Callable[[dict[str, Any]], bool],
+) -> Optional[dict[str, Any]]:
+    # Like list_session_actions_by_session, but returns the first session action that matches
+    # predicate as soon as any session's response contains one, without waiting for the rest.
+    if not sessions:
+        return None
+
+    executor = ThreadPoolExecutor(max_workers=min(16, len(sessions)))
+    try:
+        futures = [
+            executor.submit(
+                _list_session_actions,
+                deadline_client,
+                job,
+                session,
+            )
+            for session in sessions
+        ]
+        for future in as_completed(futures):
+            session_actions = future.result()
+            LOG.info(f"Session actions: {session_actions}")
+            match = next(filter(predicate, session_actions), None)
+            if match is not None:
+                return match
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def session_action_kind(session_action: dict[str, Any]) -> str:
+    # "definition" is a union with exactly one member set, e.g. {"taskRun": {...}}, so its only
+    # key names the kind of action
+    return next(iter(session_action["definition"]))
+
+
+def environment_name(environment_action: dict[str, Any]) -> str:
+    # Environment IDs look like "JOB:<jobId>:<name>" or "STEP:<stepId>:<name>"
+    return environment_action["environmentId"].split(":", 2)[-1]
+
+
+def write_small_files(directory: str, contents_by_name: dict[bytes, bytes]) -> None:
+    # For the tests that sync thousands of tiny input files. Each file is written through a raw file
+    # descriptor, which costs just open, write and close, with no buffered file object. The writes
+    # run on a thread pool because those system calls release the GIL.
+    directory_b: bytes = os.fsencode(directory)
+
+    def _write(name: bytes) -> None:
+        fd: int = os.open(
+            os.path.join(directory_b, name), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644
+        )
+        try:
+            os.write(fd, contents_by_name[name])
+        finally:
+            os.close(fd)
+
+    with ThreadPoolExecutor(max_workers=(os.cpu_count() or 4) * 2) as executor:
+        list(executor.map(_write, contents_by_name))
+
+
+def sha256_file(file: io.BufferedReader, trailing_data: bytes = b"") -> str:
+    # Returns the hex sha256 of the file from its current position to its end, followed by
+    # trailing_data. hashlib.file_digest (Python 3.11+) runs the read loop in C.
+    if hasattr(hashlib, "file_digest"):
+        digest = hashlib.file_digest(file, "sha256")
+    else:
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file.read(64 * 1024), b""):
+            digest.update(chunk)
+    digest.update(trailing_data)
+    return digest.hexdigest()
+
+
 def submit_sleep_job(
     job_name: str, deadline_client: DeadlineClient, farm: Farm, queue: Queue
 ) -> Job: